@@ -11,6 +11,8 @@ from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Naudojam tavo esamą loaderį:
 # bot/config/secrets.py -> __init__ užkrauna bot/data/secrets/secrets.env į os.environ
@@ -49,6 +51,15 @@ class BybitClient:
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
 
+        # Tas pats pooling'as kaip OKXClient: keep-alive + retry ant 5xx
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     # -----------------------------
     # Config from env
     # -----------------------------
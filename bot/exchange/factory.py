@@ -10,6 +10,10 @@ from .okx_exchange import OKXExchange
 from .bybit_exchange import BybitExchange
 
 
+_OKX_NAMES = frozenset(("OKX",))
+_BYBIT_NAMES = frozenset(("BYBIT", "BYB"))
+
+
 def _resolve_env_path(env_path: str | None = None) -> Path:
     """
     Resolve env path without validating required keys.
@@ -80,10 +84,10 @@ def create_exchange(exchange: Optional[str] = None, env_path: Optional[str] = No
 
     ex = (exchange or os.getenv("EXCHANGE") or "OKX").strip().upper()
 
-    if ex in ("OKX",):
+    if ex in _OKX_NAMES:
         return OKXExchange.from_env()
 
-    if ex in ("BYBIT", "BYB"):
+    if ex in _BYBIT_NAMES:
         return BybitExchange.from_env()
 
     raise ExchangeError(f"Unknown exchange: {ex!r}. Supported: OKX, BYBIT")
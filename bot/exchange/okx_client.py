@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from typing import Any, Dict, Optional, Tuple, List
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Optional: tavo esamas loaderis (bot/config/secrets.py), kad užkrautų bot/data/secrets/secrets.env
 try:
@@ -53,6 +55,16 @@ class OKXClient:
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
 
+        # Connection pooling + keep-alive: pakartotiniai requestai nebemoka
+        # TCP+TLS handshake kainos. Retry tik ant laikinų 5xx.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     # -----------------------------
     # Config from env
     # -----------------------------
@@ -175,7 +187,9 @@ class OKXClient:
             raise OKXError(f"OKX HTTP error: {e}")
 
         try:
-            j = resp.json()
+            # json.loads(resp.content) vietoj resp.json() - apeina requests
+            # charset detekciją (OKX visada grąžina UTF-8 JSON)
+            j = json.loads(resp.content)
         except Exception:
             raise OKXError(f"OKX non-JSON response ({resp.status_code}): {resp.text[:800]}")
 
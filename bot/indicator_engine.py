@@ -123,19 +123,21 @@ class IndicatorEngine:
         if self.df is None or self.df.empty:
             return
 
-        self._compute_macd()
-        self._compute_bb()
-        self._compute_atr()
+        # close stulpelį ištraukiam vieną kartą - visi trys indikatoriai
+        # naudoja tą pačią kopiją vietoj trijų atskirų tolist()
+        closes = self.df["close"].tolist()
+
+        self._compute_macd(closes)
+        self._compute_bb(closes)
+        self._compute_atr(closes)
 
     # ----------------------------------------------------
     # MACD
     # ----------------------------------------------------
 
-    def _compute_macd(self) -> None:
+    def _compute_macd(self, closes: List[float]) -> None:
         assert self.df is not None
 
-        closes = self.df["close"].tolist()
-
         p = self.macd_params
         fast = int(p.get("fast", 12))
         slow = int(p.get("slow", 26))
@@ -156,11 +158,9 @@ class IndicatorEngine:
     # BB
     # ----------------------------------------------------
 
-    def _compute_bb(self) -> None:
+    def _compute_bb(self, closes: List[float]) -> None:
         assert self.df is not None
 
-        closes = self.df["close"].tolist()
-
         p = self.bb_params
         period = int(p.get("period", 20))
         std_mult = float(p.get("std_mult", 2.0))
@@ -179,12 +179,11 @@ class IndicatorEngine:
     # ATR
     # ----------------------------------------------------
 
-    def _compute_atr(self) -> None:
+    def _compute_atr(self, closes: List[float]) -> None:
         assert self.df is not None
 
         highs = self.df["high"].tolist()
         lows = self.df["low"].tolist()
-        closes = self.df["close"].tolist()
 
         atr = calculate_atr(
             highs=highs,
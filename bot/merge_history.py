@@ -71,13 +71,14 @@ def merge_finam_files(input_paths: list[str], output_path: str) -> dict:
     out_path = Path(output_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with out_path.open("w", encoding="utf-8", newline="") as f:
+    # didelis buferis + writerows (C lygio _csv ciklas) vietoj rašymo po eilutę
+    with open(out_path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
         writer = csv.DictWriter(f, fieldnames=FINAM_FIELDS)
         writer.writeheader()
-        for k in keys_sorted:
-            row = merged[k]
-            out_row = {field: row.get(field, "") for field in FINAM_FIELDS}
-            writer.writerow(out_row)
+        writer.writerows(
+            {field: merged[k].get(field, "") for field in FINAM_FIELDS}
+            for k in keys_sorted
+        )
 
     return {
         "files": len(input_paths),
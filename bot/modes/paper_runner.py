@@ -7,7 +7,6 @@ from datetime import datetime
 import requests
 
 from bot.history_manager import Bar
-from bot.modes.backtest_runner import BacktestRunner
 
 logger = logging.getLogger("bot.testnet")
 
@@ -161,6 +160,10 @@ class TestnetRunner:
             pass
 
         try:
+            # lazy import: backtest_runner reikalingas tik čia, o kai kuriuose
+            # build'uose jo apskritai nėra - neverčiam modulio load'o mokėti
+            from bot.modes.backtest_runner import BacktestRunner
+
             runner = BacktestRunner(self.bot, history_path="")
             if hasattr(runner, "run_on_bars"):
                 return runner.run_on_bars(bars)
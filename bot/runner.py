@@ -156,6 +156,10 @@ class TradingBot:
         self.equity_curve: list[float] = []
         self.equity_times: list = []
 
+        # kuris risk atributas laiko equity ("equity" arba "balance") -
+        # išsiaiškinam vieną kartą, ne kiekvieną get_equity_now() kvietimą
+        self._equity_attr: str | None = None
+
         self.pending_long: dict | None = None
         self.pending_short: dict | None = None
         self.pending_add_long: dict | None = None
@@ -251,12 +255,16 @@ class TradingBot:
 
     def get_equity_now(self) -> float:
         try:
-            v = getattr(self.risk, "equity", None)
-            if v is None:
-                v = getattr(self.risk, "balance", None)
-            if v is None:
-                return 0.0
-            return float(v)
+            attr = self._equity_attr
+            if attr is None:
+                for name in ("equity", "balance"):
+                    if getattr(self.risk, name, None) is not None:
+                        attr = name
+                        break
+                if attr is None:
+                    return 0.0
+                self._equity_attr = attr
+            return float(getattr(self.risk, attr))
         except Exception:
             return 0.0
 
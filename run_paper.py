@@ -1,10 +1,12 @@
 # run_paper.py
 from __future__ import annotations
 
+import bisect
 import os
 import sys
 import time
 import logging
+from functools import lru_cache
 from datetime import datetime, timezone
 from typing import Optional, List
 
@@ -27,21 +29,22 @@ def _load_env_file(path: str) -> None:
         return
     try:
         with open(path, "r", encoding="utf-8") as f:
-            for raw in f.readlines():
-                line = raw.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                k = k.strip()
-                v = v.strip()
-                if not k:
-                    continue
-                if len(v) >= 2 and ((v[0] == v[-1] == '"') or (v[0] == v[-1] == "'")):
-                    v = v[1:-1]
-                if k not in os.environ:
-                    os.environ[k] = v
+            content = f.read()
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            k, _, v = line.partition("=")
+            if not _:
+                continue
+            k = k.strip()
+            v = v.strip()
+            if not k:
+                continue
+            if len(v) >= 2 and ((v[0] == v[-1] == '"') or (v[0] == v[-1] == "'")):
+                v = v[1:-1]
+            if k not in os.environ:
+                os.environ[k] = v
     except Exception:
         pass
 
@@ -66,14 +69,32 @@ logger = logging.getLogger("paper_live")
 from bot.runner import TradingBot
 from bot.history_manager import Bar
 from bot.exchange.factory import create_exchange
+from bot.strategy_long import IndicatorsSnap as LongSnap
+from bot.strategy_short import IndicatorsSnap as ShortSnap
+
+
+# SHORT signalų pavadinimai, kuriuos priimam iš strategijos (vienas set'as,
+# ne per kiekvieną barą naujai kuriamas tuple)
+_SHORT_ENTRY_SIGNALS = frozenset(("FULL_SHORT", "SHORT", "FULL_SHORT_SIGNAL"))
 
 
 def utc_now_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
 
+# dažniausi TF - lentelė vietoj parsinimo kiekvieną kvietimą
+_TF_TABLE = {
+    "1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30,
+    "1h": 60, "2h": 120, "4h": 240, "6h": 360, "12h": 720,
+    "1d": 1440,
+}
+
+
 def tf_to_minutes(tf: str) -> int:
     tf = tf.strip().lower()
+    minutes = _TF_TABLE.get(tf)
+    if minutes is not None:
+        return minutes
     if tf.endswith("m"):
         return int(tf[:-1])
     if tf.endswith("h"):
@@ -86,29 +107,40 @@ def tf_to_minutes(tf: str) -> int:
 
 
 def pick_last_closed_row(
-    rows: List[List[float]],
+    rows_sorted: List[List[float]],
     tf_ms: int,
     server_time_ms: int,
     *,
     close_lag_ms: int = 1500,
 ) -> Optional[List[float]]:
-    if not rows:
+    """
+    rows_sorted TURI būti surūšiuoti pagal ts didėjančiai (caller'is rūšiuoja
+    vieną kartą ir tą patį sąrašą naudoja ir barams).
+    """
+    if not rows_sorted:
         return None
 
-    rows_sorted = sorted(rows, key=lambda r: int(r[0]))
-    cutoff = int(server_time_ms) - int(close_lag_ms)
+    cutoff = int(server_time_ms) - close_lag_ms
 
-    last_closed = None
-    for r in rows_sorted:
-        ts = int(r[0])
-        if ts + tf_ms <= cutoff:
-            last_closed = r
-    return last_closed
+    # ieškom didžiausio ts, kuriam ts + tf_ms <= cutoff - binary search
+    # vietoj viso sąrašo perėjimo
+    i = bisect.bisect_right(rows_sorted, cutoff - tf_ms, key=lambda r: int(r[0])) - 1
+    return rows_sorted[i] if i >= 0 else None
+
+
+@lru_cache(maxsize=2048)
+def _utc_str_from_ms(ts_ms: int) -> str:
+    """strftime yra brangus (locale + formato parsinimas) - tie patys ts
+    kartojasi kas poll'ą, tad formatuojam vieną kartą per ts.
+
+    time.gmtime + time.strftime apeina datetime/timezone objektų kūrimą;
+    rezultatas tas pats "YYYY-MM-DD HH:MM:SS" UTC stringas."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts_ms // 1000))
 
 
 def row_to_bar(symbol: str, per_min: int, r: List[float]) -> Bar:
     ts_ms = int(r[0])
-    dt = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    dt = _utc_str_from_ms(ts_ms)
     return Bar(
         ticker=symbol,
         per=per_min,
@@ -187,36 +219,88 @@ def main() -> None:
     last_closed_ts: Optional[int] = None
     bar_index = -1
 
+    # Bar objektai pagal ts: float konversijos ir strftime mokamos vieną kartą
+    # per barą, ne kiekvieną kartą perstatant visą langą
+    bar_cache: dict[int, Bar] = {}
+    bar_cache_max = max(10, min(history_limit, 500)) * 2
+
+    # pastovūs visai sesijai - nebeskaitom getattr/stulpelių kas barą
+    bb_lb = int(getattr(bot.strategy_long, "bb_lookback", 4))
+    bb_n = bb_lb + 1
+    has_bb_cols: Optional[bool] = None
+
     logger.info("HEARTBEAT | loop started (Ctrl+C to stop)")
 
+    # lokalūs bind'ai hot loop'ui: LOAD_FAST vietoj atributų grandinių
+    fetch_ohlcv = exchange.fetch_ohlcv
+    get_server_ms = exchange.server_time_ms
+    sleep = time.sleep
+    fetch_limit = max(10, min(history_limit, 500))
+
+    # serverio laiką užklausiam retai: offset'ą nuo lokalaus laikrodžio
+    # išsimatuojam startui ir atsinaujinam kas ~300s, vietoj atskiro HTTP
+    # kvietimo kiekvieną poll'ą
+    time_offset_ms = 0
+    st = get_server_ms()
+    if st:
+        time_offset_ms = int(st) - int(time.time() * 1000)
+    next_resync = time.monotonic() + 300.0
+
     try:
         while True:
             try:
-                server_ms = exchange.server_time_ms() or int(time.time() * 1000)
-
-                rows = exchange.fetch_ohlcv(
+                if time.monotonic() >= next_resync:
+                    st = get_server_ms()
+                    if st:
+                        time_offset_ms = int(st) - int(time.time() * 1000)
+                    next_resync = time.monotonic() + 300.0
+                server_ms = int(time.time() * 1000) + time_offset_ms
+
+                rows = fetch_ohlcv(
                     symbol,
                     tf,
                     since_ms=None,
-                    limit=max(10, min(history_limit, 500)),
+                    limit=fetch_limit,
                 )
 
+                # pigus patikrinimas dar PRIEŠ sort'ą: koks naujausias jau
+                # užsidaręs ts? Daugumoje poll'ų jis nepasikeitęs (poll kas
+                # ~0.8s, žvakė 1m+), tad visą likusį darbą galima praleisti
+                cutoff_ts = int(server_ms) - close_lag_ms - tf_ms
+                newest_closed_ts = -1
+                for r in rows:
+                    r_ts = int(r[0])
+                    if r_ts <= cutoff_ts and r_ts > newest_closed_ts:
+                        newest_closed_ts = r_ts
+
+                if newest_closed_ts < 0:
+                    logger.info("HEARTBEAT | no closed candle yet")
+                    sleep(poll_sleep_sec)
+                    continue
+
+                if last_closed_ts is not None and newest_closed_ts == last_closed_ts:
+                    # adaptyvus laukimas: iki kitos žvakės uždarymo dar žinomas
+                    # laikas, tad miegam pusę likusio tarpo (konverguoja per
+                    # kelis fetch'us) vietoj fiksuoto poll'o kas 0.8s
+                    wait_ms = last_closed_ts + 2 * tf_ms + close_lag_ms - server_ms
+                    sleep(max(poll_sleep_sec, min(wait_ms / 2000.0, 30.0)))
+                    continue
+
+                # tik čia (nauja žvakė) mokame už sort'ą ir barų statybą
+                # (adapterio ts jau numeric - int() kas palyginimą nereikalingas)
+                rows.sort(key=lambda r: r[0])
+
                 last_closed = pick_last_closed_row(
                     rows,
                     tf_ms=tf_ms,
                     server_time_ms=server_ms,
                     close_lag_ms=close_lag_ms,
                 )
-
                 if last_closed is None:
-                    logger.info("HEARTBEAT | no closed candle yet")
-                    time.sleep(poll_sleep_sec)
+                    sleep(poll_sleep_sec)
                     continue
 
                 ts = int(last_closed[0])
-                if last_closed_ts is not None and ts == last_closed_ts:
-                    time.sleep(poll_sleep_sec)
-                    continue
 
                 last_closed_ts = ts
                 bar_index += 1
@@ -224,8 +308,21 @@ def main() -> None:
 
                 logger.info("CANDLE | %s | close=%.2f", bar.datetime, bar.close)
 
-                bars_rows_sorted = sorted(rows, key=lambda r: int(r[0]))
-                bars = [row_to_bar(symbol, per_min, r) for r in bars_rows_sorted]
+                bars = []
+                for r in rows:
+                    r_ts = int(r[0])
+                    if r_ts > cutoff_ts:
+                        # dar atvira žvakė: OHLCV dalinis ir keisis iki
+                        # uždarymo, tad cache'inti negalima - statom šviežią
+                        bars.append(row_to_bar(symbol, per_min, r))
+                        continue
+                    b = bar_cache.get(r_ts)
+                    if b is None:
+                        b = row_to_bar(symbol, per_min, r)
+                        bar_cache[r_ts] = b
+                    bars.append(b)
+                while len(bar_cache) > bar_cache_max:
+                    bar_cache.pop(next(iter(bar_cache)))
 
                 # Indicators
                 try:
@@ -233,7 +330,7 @@ def main() -> None:
                     df = bot.df
                 except Exception as e:
                     logger.exception("ERROR | indicator compute failed: %s", e)
-                    time.sleep(error_sleep_sec)
+                    sleep(error_sleep_sec)
                     continue
 
                 # Snapshot for strategies
@@ -244,18 +341,24 @@ def main() -> None:
                 psar = None
 
                 try:
-                    if df is not None and len(df) > 0:
-                        last = df.iloc[-1]
-                        macd = last.get("macd")
-                        macd_signal = last.get("macd_signal")
-                        atr = last.get("atr")
-                        psar = last.get("psar")
-
-                        lb = int(getattr(bot.strategy_long, "bb_lookback", 4))
-                        n = lb + 1
-                        bb_mid_seq = df["bb_mid"].iloc[-n:].tolist() if "bb_mid" in df.columns else []
-                        bb_upper_seq = df["bb_upper"].iloc[-n:].tolist() if "bb_upper" in df.columns else []
-                        bb_lower_seq = df["bb_lower"].iloc[-n:].tolist() if "bb_lower" in df.columns else []
+                    if df is not None and not df.empty:
+                        # tiesioginiai stulpelių skaitymai iš engine Frame
+                        # (Frame neturi pandas iloc - skaitom [-1] iš SeriesList)
+                        macd_col = df.get("macd")
+                        macd = macd_col[-1] if macd_col else None
+                        sig_col = df.get("macd_signal")
+                        macd_signal = sig_col[-1] if sig_col else None
+                        atr_col = df.get("atr")
+                        atr = atr_col[-1] if atr_col else None
+                        psar_col = df.get("psar")
+                        psar = psar_col[-1] if psar_col else None
+
+                        if has_bb_cols is None:
+                            has_bb_cols = ("bb_mid" in df) and ("bb_upper" in df) and ("bb_lower" in df)
+                        if has_bb_cols:
+                            bb_mid_seq = df["bb_mid"][-bb_n:]
+                            bb_upper_seq = df["bb_upper"][-bb_n:]
+                            bb_lower_seq = df["bb_lower"][-bb_n:]
                 except Exception:
                     macd = macd_signal = atr = psar = None
                     bb_mid_seq = []
@@ -268,7 +371,6 @@ def main() -> None:
 
                 # LONG
                 try:
-                    from bot.strategy_long import IndicatorsSnap as LongSnap
                     snap_l = LongSnap(
                         macd=float(macd) if macd is not None else None,
                         macd_signal=float(macd_signal) if macd_signal is not None else None,
@@ -283,7 +385,6 @@ def main() -> None:
 
                 # SHORT
                 try:
-                    from bot.strategy_short import IndicatorsSnap as ShortSnap
                     try:
                         snap_s = ShortSnap(
                             macd=float(macd) if macd is not None else None,
@@ -304,10 +405,14 @@ def main() -> None:
                     logger.exception("ERROR | strategy_short.on_bar failed: %s", e)
                     signal_short = None
 
+                # risk objektas kviečiamas daug kartų per barą -
+                # pasiimam lokaliai vieną kartą
+                risk = bot.risk
+
                 # Trailing SL update
                 try:
-                    if bot.risk.in_position and atr is not None:
-                        bot.risk.update_sl_with_sar(
+                    if risk.in_position and atr is not None:
+                        risk.update_sl_with_sar(
                             current_price=bar.close,
                             atr=float(atr),
                             psar=float(psar) if psar is not None else None,
@@ -317,10 +422,10 @@ def main() -> None:
 
                 # Exit
                 try:
-                    if bot.risk.in_position:
-                        reason = bot.risk.check_exit(bar.close)
+                    if risk.in_position:
+                        reason = risk.check_exit(bar.close)
                         if reason:
-                            pnl = bot.risk.exit_position(bar.close)
+                            pnl = risk.exit_position(bar.close)
                             bot.append_trade_log_on_exit(
                                 exit_dt=bar.datetime,
                                 exit_reason=reason,
@@ -337,13 +442,13 @@ def main() -> None:
 
                 # Entry (paper)
                 try:
-                    if not bot.risk.in_position:
+                    if not risk.in_position:
                         if signal_long == "FULL_LONG":
                             if atr is None or float(atr) <= 0:
                                 logger.info("ENTRY | LONG skipped (ATR not ready)")
                             else:
-                                bot.risk.enter_partial_long(entry_price=bar.close, atr=float(atr))
-                                bot.risk.add_full_long(entry_price=bar.close, atr=float(atr))
+                                risk.enter_partial_long(entry_price=bar.close, atr=float(atr))
+                                risk.add_full_long(entry_price=bar.close, atr=float(atr))
                                 bot.snapshot_entry_ctx(
                                     bar_dt=bar.datetime,
                                     side="LONG",
@@ -351,25 +456,28 @@ def main() -> None:
                                     signal=signal_long,
                                     entry_bar_index=bar_index,
                                 )
-                                logger.info(
-                                    "ENTRY | side=LONG signal=%s price=%.2f tp=%s sl=%s units=%.6f stake=%.2f equity=%.2f",
-                                    signal_long,
-                                    bar.close,
-                                    f"{bot.risk.tp_price:.2f}" if bot.risk.tp_price else None,
-                                    f"{bot.risk.sl_price:.2f}" if bot.risk.sl_price else None,
-                                    bot.risk.position_units,
-                                    bot.risk.trade_stake,
-                                    bot.get_equity_now(),
-                                )
+                                # tp/sl f-stringai suformatuojami dar prieš logging'ui
+                                # sprendžiant ar įrašas reikalingas - gate'inam
+                                if logger.isEnabledFor(logging.INFO):
+                                    logger.info(
+                                        "ENTRY | side=LONG signal=%s price=%.2f tp=%s sl=%s units=%.6f stake=%.2f equity=%.2f",
+                                        signal_long,
+                                        bar.close,
+                                        f"{risk.tp_price:.2f}" if risk.tp_price else None,
+                                        f"{risk.sl_price:.2f}" if risk.sl_price else None,
+                                        risk.position_units,
+                                        risk.trade_stake,
+                                        bot.get_equity_now(),
+                                    )
 
-                        elif signal_short in ("FULL_SHORT", "SHORT", "FULL_SHORT_SIGNAL"):
+                        elif signal_short in _SHORT_ENTRY_SIGNALS:
                             if atr is None or float(atr) <= 0:
                                 logger.info("ENTRY | SHORT skipped (ATR not ready)")
                             else:
                                 # Your build may be long-only in risk manager; we log if short methods absent
                                 try:
-                                    bot.risk.enter_partial_short(entry_price=bar.close, atr=float(atr))
-                                    bot.risk.add_full_short(entry_price=bar.close, atr=float(atr))
+                                    risk.enter_partial_short(entry_price=bar.close, atr=float(atr))
+                                    risk.add_full_short(entry_price=bar.close, atr=float(atr))
                                 except AttributeError:
                                     logger.warning("ENTRY | SHORT signal but risk manager has no short methods (long-only build)")
                                 else:
@@ -380,16 +488,17 @@ def main() -> None:
                                         signal=str(signal_short),
                                         entry_bar_index=bar_index,
                                     )
-                                    logger.info(
-                                        "ENTRY | side=SHORT signal=%s price=%.2f tp=%s sl=%s units=%.6f stake=%.2f equity=%.2f",
-                                        signal_short,
-                                        bar.close,
-                                        f"{bot.risk.tp_price:.2f}" if bot.risk.tp_price else None,
-                                        f"{bot.risk.sl_price:.2f}" if bot.risk.sl_price else None,
-                                        bot.risk.position_units,
-                                        bot.risk.trade_stake,
-                                        bot.get_equity_now(),
-                                    )
+                                    if logger.isEnabledFor(logging.INFO):
+                                        logger.info(
+                                            "ENTRY | side=SHORT signal=%s price=%.2f tp=%s sl=%s units=%.6f stake=%.2f equity=%.2f",
+                                            signal_short,
+                                            bar.close,
+                                            f"{risk.tp_price:.2f}" if risk.tp_price else None,
+                                            f"{risk.sl_price:.2f}" if risk.sl_price else None,
+                                            risk.position_units,
+                                            risk.trade_stake,
+                                            bot.get_equity_now(),
+                                        )
                 except Exception as e:
                     logger.exception("ERROR | entry flow failed: %s", e)
 
@@ -399,13 +508,13 @@ def main() -> None:
                 except Exception:
                     pass
 
-                time.sleep(0.2)
+                sleep(0.2)
 
             except KeyboardInterrupt:
                 raise
             except Exception as e:
                 logger.exception("ERROR | loop exception: %s", e)
-                time.sleep(error_sleep_sec)
+                sleep(error_sleep_sec)
 
     except KeyboardInterrupt:
         logger.info("HEARTBEAT | stopped by user (Ctrl+C)")